@@ -1,13 +1,53 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, insert
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.dialects.postgresql import JSONB
 from flask_login import LoginManager, UserMixin, login_user, logout_user, current_user, login_required
 from werkzeug.security import generate_password_hash, check_password_hash
 import json # For handling ABE attributes and ESP32 data
 import os
+import hmac
+import sqlite3
+import time
+import atexit
+import threading
+from collections import deque
+try:
+    import orjson # Faster (de)serialization of ESP32 payloads, falls back to stdlib json
+except ImportError:
+    orjson = None
+try:
+    from flask_orjson import OrjsonProvider # orjson-backed provider for jsonify()
+except ImportError:
+    OrjsonProvider = None
+try:
+    from flask_compress import Compress # gzip/deflate compression of responses
+except ImportError:
+    Compress = None
+try:
+    from argon2 import PasswordHasher # Argon2id password hashing (argon2-cffi)
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:
+    PasswordHasher = None
 from datetime import datetime
 
+# JSON helpers (orjson when available, stdlib json otherwise)
+def json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
 # Initialize Flask App
 app = Flask(__name__)
+if OrjsonProvider is not None:
+    app.json = OrjsonProvider(app) # All jsonify() responses are serialized by orjson
 
 @app.context_processor
 def inject_now():
@@ -17,52 +57,243 @@ def inject_now():
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'your_strong_secret_key_here') # Change in production!
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///vehicle_data.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['ESP32_SHARED_SECRET'] = os.environ.get('ESP32_SHARED_SECRET') # HMAC key for /api/vehicle_data; unset disables signature checks
+app.config['COMPRESS_MIN_SIZE'] = 512 # Bytes; smaller responses aren't worth compressing
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    # (De)serialize JSON columns with orjson when available
+    'json_serializer': json_dumps,
+    'json_deserializer': json_loads,
+    'pool_pre_ping': True,
+}
+_database_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+if not (_database_url.get_backend_name() == 'sqlite' and _database_url.database in (None, '', ':memory:')):
+    # Connection pool shared by request threads and the ingest thread
+    # (in-memory SQLite uses a single shared connection, which takes no pool sizing)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'].update(pool_size=10, max_overflow=20)
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets the dashboard read while ESP32 data is being written
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
 
 # Initialize Extensions
 db = SQLAlchemy(app)
+if Compress is not None:
+    Compress(app)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login' # Redirect to login page if @login_required is used
 login_manager.login_message_category = 'info' # Flash message category
 
+# Password hashing: Argon2id when argon2-cffi is installed, werkzeug scrypt (N=32768, r=8, p=1) otherwise.
+# Hashes from the other scheme (or older werkzeug defaults like pbkdf2) still verify and are upgraded on login.
+PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+password_hasher = PasswordHasher() if PasswordHasher is not None else None
+
+def hash_password(password):
+    if password_hasher is not None:
+        return password_hasher.hash(password)
+    return generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+
+def verify_password(password_hash, password):
+    if password_hash.startswith('$argon2'):
+        if password_hasher is None:
+            return False
+        try:
+            return password_hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(password_hash, password)
+
+def password_needs_rehash(password_hash):
+    if password_hasher is not None:
+        return not password_hash.startswith('$argon2') or password_hasher.check_needs_rehash(password_hash)
+    return not password_hash.startswith(PASSWORD_HASH_METHOD + '$')
+
+# Checked against when a login username doesn't exist, so both paths cost one hash verification
+DUMMY_PASSWORD_HASH = hash_password(os.urandom(16).hex())
+
 # --- Database Models ---
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(100), unique=True, nullable=False)
+    username = db.Column(db.String(100), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(200), nullable=False)
     role = db.Column(db.String(50), nullable=False)  # 'doctor' or 'police'
     abe_attributes = db.Column(db.Text, nullable=True)  # JSON string for ABE attributes
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
-
-    def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        self.password_hash = hash_password(password)
 
     def __repr__(self):
         return f'<User {self.username} ({self.role})>'
 
 class VehicleData(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    vehicle_id = db.Column(db.String(100), nullable=False, index=True)
-    timestamp_server = db.Column(db.DateTime, default=datetime.utcnow, index=True)
-    payload = db.Column(db.Text, nullable=False) # Raw JSON payload from ESP32
+    vehicle_id = db.Column(db.String(100), nullable=False) # Indexed via ix_vehicle_data_vehicle_id_id below
+    timestamp_server = db.Column(db.DateTime, default=datetime.utcnow)
+    payload = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'), nullable=False) # JSON payload from ESP32 (JSONB on Postgres)
     # For ABE, encrypted data might be stored here or in a related table
-    # For simplicity, payload is stored as JSON text. Decryption would happen on access based on user.role and ABE attributes.
+    # For simplicity, payload is stored as native JSON. Decryption would happen on access based on user.role and ABE attributes.
+
+    __table_args__ = (
+        # Backs the latest-entry-per-vehicle lookup in get_latest_vehicle_data and any vehicle_id lookup
+        db.Index('ix_vehicle_data_vehicle_id_id', vehicle_id, id.desc()),
+        # Dashboard: ORDER BY timestamp_server DESC LIMIT 50
+        db.Index('ix_vehicle_data_ts_desc', timestamp_server.desc()),
+    )
 
     def __repr__(self):
         return f'<VehicleData {self.id} for {self.vehicle_id} at {self.timestamp_server}>'
 
     @property
     def parsed_payload(self):
+        # The JSON column is decoded by the database driver when the row is loaded
+        return self.payload if isinstance(self.payload, dict) else {}
+
+# --- Latest Vehicle Data Cache ---
+# Short-lived cache for /api/latest_vehicle_data; invalidated whenever new rows are committed.
+LATEST_DATA_CACHE_TTL = 2 # Seconds
+
+_latest_data_cache = {} # 'latest' -> (expires_at, generation, locations)
+_latest_data_cache_lock = threading.Lock() # Held by map polls only, never by the ingest thread
+_latest_data_generation = 0 # Bumped on every commit; cached entries from older generations are stale
+
+def invalidate_latest_data_cache():
+    # Lock-free so ingest never waits on a map query in progress
+    global _latest_data_generation
+    _latest_data_generation += 1
+
+# --- Buffered Vehicle Data Ingest ---
+# ESP32 posts are queued and written by a background thread in batches, so one
+# transaction (and one fsync) covers many rows instead of one per request.
+INGEST_BATCH_SIZE = 500 # Max rows per INSERT/commit
+INGEST_FLUSH_INTERVAL = 0.1 # Seconds between flushes
+INGEST_QUEUE_MAX = 50000 # Rows buffered before new posts are refused with 503
+INGEST_RETRY_BACKOFF_MAX = 30 # Seconds; cap on the wait between retries while the database is unavailable
+
+_ingest_queue = deque() # deque.append/popleft are thread-safe
+_ingest_wakeup = threading.Event()
+_ingest_thread = None
+_ingest_thread_lock = threading.Lock()
+
+def _is_transient_db_error(e):
+    # Lost connections, locked SQLite databases, server restarts: the rows are fine, retry them later
+    return isinstance(e, OperationalError) or (isinstance(e, DBAPIError) and e.connection_invalidated)
+
+def _requeue_vehicle_data_rows(rows):
+    # Back to the front of the queue, in their original order
+    _ingest_queue.extendleft(reversed(rows))
+
+def flush_vehicle_data():
+    """Writes all buffered vehicle data rows. Must run inside an app context.
+
+    Returns False if the database was unavailable; the unwritten rows stay queued.
+    """
+    while _ingest_queue:
+        rows = []
+        while _ingest_queue and len(rows) < INGEST_BATCH_SIZE:
+            rows.append(_ingest_queue.popleft())
+        try:
+            # executemany insert; SQLAlchemy batches this into multi-row VALUES on Postgres
+            db.session.execute(insert(VehicleData), rows)
+            db.session.commit()
+        except Exception as e:
+            if _is_transient_db_error(e):
+                _requeue_vehicle_data_rows(rows)
+                db.session.rollback()
+                app.logger.warning(f"Database unavailable, {len(_ingest_queue)} vehicle data rows queued for retry: {e}")
+                return False
+            db.session.rollback()
+            app.logger.warning(f"Error saving {len(rows)} vehicle data rows, retrying one at a time: {e}")
+            if not _insert_vehicle_data_rows_individually(rows):
+                return False
+        else:
+            invalidate_latest_data_cache()
+    return True
+
+def _insert_vehicle_data_rows_individually(rows):
+    # Isolates bad rows so they don't take the rest of their batch down with them
+    saved = 0
+    completed = True
+    for i, row in enumerate(rows):
         try:
-            return json.loads(self.payload)
-        except json.JSONDecodeError:
-            return {}
+            db.session.execute(insert(VehicleData), [row])
+            db.session.commit()
+            saved += 1
+        except Exception as e:
+            if _is_transient_db_error(e):
+                _requeue_vehicle_data_rows(rows[i:])
+                db.session.rollback()
+                app.logger.warning(f"Database unavailable, {len(_ingest_queue)} vehicle data rows queued for retry: {e}")
+                completed = False
+                break
+            # Failed on its own with a non-transient error (IntegrityError, DataError, ...): the row itself is bad
+            db.session.rollback()
+            app.logger.error(f"Dropping vehicle data row for {row['vehicle_id']!r}: {e}")
+    if saved:
+        invalidate_latest_data_cache()
+    return completed
+
+def _ingest_worker():
+    backoff = INGEST_FLUSH_INTERVAL
+    with app.app_context():
+        while True:
+            _ingest_wakeup.wait(INGEST_FLUSH_INTERVAL)
+            _ingest_wakeup.clear()
+            # Nothing may escape the loop: a dead writer would leave every later row queued forever
+            try:
+                flushed = flush_vehicle_data()
+            except Exception:
+                app.logger.exception("Unexpected error in vehicle data ingest thread")
+                flushed = False
+            try:
+                db.session.remove()
+            except Exception:
+                app.logger.exception("Error releasing vehicle data ingest session")
+            if flushed:
+                backoff = INGEST_FLUSH_INTERVAL
+            else:
+                # Database unavailable: wait before retrying, doubling up to the cap
+                backoff = min(backoff * 2, INGEST_RETRY_BACKOFF_MAX)
+                time.sleep(backoff)
+
+def enqueue_vehicle_data(vehicle_id, payload):
+    """Buffers a vehicle data row for the background writer.
+
+    Returns False without queueing if the buffer is full (the database is falling behind).
+    """
+    global _ingest_thread
+    if len(_ingest_queue) >= INGEST_QUEUE_MAX:
+        return False
+    _ingest_queue.append({
+        'vehicle_id': vehicle_id,
+        'timestamp_server': datetime.utcnow(), # Time of receipt, not of the flush
+        'payload': payload,
+    })
+    if len(_ingest_queue) >= INGEST_BATCH_SIZE:
+        _ingest_wakeup.set()
+    if _ingest_thread is None or not _ingest_thread.is_alive():
+        # Started lazily so each server worker process gets its own writer (and restarted if it died)
+        with _ingest_thread_lock:
+            if _ingest_thread is None or not _ingest_thread.is_alive():
+                _ingest_thread = threading.Thread(target=_ingest_worker, name='vehicle-data-ingest', daemon=True)
+                _ingest_thread.start()
+    return True
+
+@atexit.register
+def _flush_vehicle_data_on_exit():
+    if _ingest_queue:
+        with app.app_context():
+            if not flush_vehicle_data():
+                app.logger.error(f"Database unavailable at shutdown, {len(_ingest_queue)} vehicle data rows were not saved")
 
 # Flask-Login User Loader
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return db.session.get(User, int(user_id)) # Identity-map aware primary key lookup
 
 # --- Routes ---
 @app.route('/')
@@ -76,17 +307,7 @@ def dashboard():
     # Fetch all data for now, sorted by most recent
     all_data = VehicleData.query.order_by(VehicleData.timestamp_server.desc()).limit(50).all()
     
-    # Prepare data for template (convert payload string to dict)
-    data_list_for_template = []
-    for item in all_data:
-        data_list_for_template.append({
-            'id': item.id,
-            'vehicle_id': item.vehicle_id,
-            'timestamp_server': item.timestamp_server,
-            'payload': item.parsed_payload # Use the property to get parsed JSON
-        })
-
-    return render_template('dashboard.html', title='Dashboard', data_list=data_list_for_template)
+    return render_template('dashboard.html', title='Dashboard', data_list=all_data) # Template reads item.parsed_payload
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -97,12 +318,21 @@ def login():
         password = request.form.get('password')
         remember = True if request.form.get('remember') else False
 
-        user = User.query.filter_by(username=username).first()
+        # One indexed lookup; the loaded User serves both verification and login_user
+        user = db.session.execute(
+            db.select(User).where(User.username == username)
+        ).scalar_one_or_none()
 
-        if not user or not user.check_password(password):
+        if user is None:
+            verify_password(DUMMY_PASSWORD_HASH, password or '') # Equalize timing with the existing-user path
+        if user is None or not verify_password(user.password_hash, password or ''):
             flash('Invalid username or password. Please try again.', 'danger')
             return redirect(url_for('login'))
         
+        if password_needs_rehash(user.password_hash):
+            # Upgrade hashes made with an older scheme or parameters while we have the plaintext
+            user.set_password(password)
+            db.session.commit()
         login_user(user, remember=remember)
         flash(f'Welcome back, {user.username}!', 'success')
         return redirect(url_for('dashboard'))
@@ -122,7 +352,7 @@ def register():
             flash('Username, password, and role are required.', 'warning')
             return redirect(url_for('register'))
 
-        if User.query.filter_by(username=username).first():
+        if db.session.execute(db.select(User.id).where(User.username == username)).first():
             flash('Username already exists. Please choose a different one.', 'warning')
             return redirect(url_for('register'))
         
@@ -134,7 +364,7 @@ def register():
         abe_data = None
         if abe_attributes_str:
             try:
-                abe_data = json.loads(abe_attributes_str)
+                abe_data = json_loads(abe_attributes_str)
                 if not isinstance(abe_data, dict):
                     flash('ABE Attributes must be a valid JSON object (e.g., {"key": "value"}).', 'warning')
                     return redirect(url_for('register'))
@@ -142,7 +372,7 @@ def register():
                 flash('Invalid JSON format for ABE Attributes.', 'warning')
                 return redirect(url_for('register'))
 
-        new_user = User(username=username, role=role, abe_attributes=json.dumps(abe_data) if abe_data else None)
+        new_user = User(username=username, role=role, abe_attributes=abe_attributes_str if abe_data else None) # Store the validated text as-is
         new_user.set_password(password)
         db.session.add(new_user)
         db.session.commit()
@@ -161,12 +391,28 @@ def logout():
 # --- API Endpoints ---
 @app.route('/api/vehicle_data', methods=['POST'])
 def receive_vehicle_data():
-    # This endpoint would ideally have some form of authentication (e.g., API key)
     if not request.is_json:
         return jsonify({"error": "Request must be JSON"}), 400
 
-    data = request.get_json()
-    
+    raw_body = request.get_data(cache=False)
+
+    # Devices sign the body with HMAC-SHA256 of the shared secret, sent hex-encoded in X-Signature
+    secret = app.config['ESP32_SHARED_SECRET']
+    if secret:
+        expected = hmac.new(secret.encode('utf-8'), raw_body, 'sha256').hexdigest()
+        signature = request.headers.get('X-Signature', '')
+        if not hmac.compare_digest(expected.encode('ascii'), signature.lower().encode('utf-8')):
+            return jsonify({"error": "Invalid signature"}), 401
+
+    # Parse the raw body directly (orjson when available) instead of Flask's cached get_json()
+    try:
+        data = json_loads(raw_body)
+    except ValueError: # Covers json/orjson.JSONDecodeError and UnicodeDecodeError on non-UTF-8 bodies
+        return jsonify({"error": "Invalid JSON"}), 400
+
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+
     vehicle_id = data.get('vehicle_id')
     # The rest of the data is treated as payload
     # Example: data could be {'vehicle_id': 'ambulance01', 'latitude': 12.34, 'longitude': 56.78, 'temperature_c': 37.5, ...}
@@ -174,6 +420,10 @@ def receive_vehicle_data():
     if not vehicle_id:
         return jsonify({"error": "Missing vehicle_id"}), 400
 
+    # Rows are written after the 202 is sent, so anything the insert would reject must be caught here
+    if not isinstance(vehicle_id, str) or len(vehicle_id) > VehicleData.vehicle_id.type.length:
+        return jsonify({"error": f"vehicle_id must be a string of at most {VehicleData.vehicle_id.type.length} characters"}), 400
+
     # Store the entire received JSON as payload, excluding vehicle_id if it's part of the main dict
     # Or, expect payload to be a nested dictionary.
     # For simplicity, let's assume the incoming data (excluding vehicle_id) is the payload.
@@ -182,18 +432,52 @@ def receive_vehicle_data():
     if not payload_data:
         return jsonify({"error": "Missing payload data"}), 400
 
-    try:
-        new_data_entry = VehicleData(
-            vehicle_id=vehicle_id,
-            payload=json.dumps(payload_data) # Store the payload as a JSON string
-        )
-        db.session.add(new_data_entry)
-        db.session.commit()
-        return jsonify({"message": "Data received successfully", "id": new_data_entry.id}), 201
-    except Exception as e:
-        db.session.rollback()
-        app.logger.error(f"Error saving vehicle data: {e}")
-        return jsonify({"error": "Failed to save data", "details": str(e)}), 500
+    # Written to the database by the background ingest thread (see enqueue_vehicle_data)
+    if not enqueue_vehicle_data(vehicle_id, payload_data):
+        # Buffer full; the device should resend later
+        return jsonify({"error": "Server busy, retry later"}), 503, {'Retry-After': '5'}
+    return jsonify({"message": "Data accepted for processing"}), 202
+
+# Latest entry for each vehicle: max(id) per vehicle_id (served by ix_vehicle_data_vehicle_id_id),
+# joined back for the row. Built once at import; SQLAlchemy caches the compiled SQL across requests.
+_latest_vehicle_ids = db.select(
+    VehicleData.vehicle_id,
+    db.func.max(VehicleData.id).label('max_id')
+).group_by(VehicleData.vehicle_id).subquery()
+
+# Only the columns the map needs; skips ORM instance hydration
+LATEST_LOCATIONS_STMT = db.select(VehicleData.vehicle_id, VehicleData.payload).join(
+    _latest_vehicle_ids, VehicleData.id == _latest_vehicle_ids.c.max_id
+)
+# Postgres variant: JSONB key-existence check, so rows without a location never leave the database
+LATEST_LOCATIONS_STMT_PG = LATEST_LOCATIONS_STMT.where(
+    VehicleData.payload.op('?')('latitude'),
+    VehicleData.payload.op('?')('longitude')
+)
+
+def query_latest_vehicle_locations():
+    """Returns the latest location of each vehicle as parallel (columnar) lists."""
+    if db.engine.dialect.name == 'postgresql':
+        results = db.session.execute(LATEST_LOCATIONS_STMT_PG).all()
+    else:
+        results = db.session.execute(LATEST_LOCATIONS_STMT).all()
+
+    # One list per field instead of one object per vehicle: no repeated keys in the JSON
+    locations = {'vehicle_ids': [], 'lat': [], 'lon': [], 'speed_kmh': [], 'timestamp_device': []}
+    for vehicle_id, payload in results:
+        if not isinstance(payload, dict):
+            continue
+        try:
+            lat = float(payload['latitude'])
+            lon = float(payload['longitude'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        locations['vehicle_ids'].append(vehicle_id)
+        locations['lat'].append(lat)
+        locations['lon'].append(lon)
+        locations['speed_kmh'].append(payload.get('speed_kmh')) # For map popups
+        locations['timestamp_device'].append(payload.get('timestamp_device'))
+    return locations
 
 # (Optional) API endpoint for AJAX map updates
 @app.route('/api/latest_vehicle_data')
@@ -202,36 +486,17 @@ def get_latest_vehicle_data():
     if current_user.role != 'police':
         return jsonify({"error": "Unauthorized"}), 403
 
-    # Fetch latest distinct location for each vehicle
-    # This is a simplified query; a more robust solution might involve window functions or subqueries
-    # depending on the database and exact requirements.
-    latest_data = db.session.query(
-        VehicleData.vehicle_id,
-        db.func.max(VehicleData.timestamp_server).label('latest_timestamp'),
-        VehicleData.payload
-    ).group_by(VehicleData.vehicle_id).order_by(db.desc('latest_timestamp')).all()
-    
-    # This query above is not quite right for getting the payload of the latest. 
-    # A better way for SQLite or simple cases:
-    subquery = db.session.query(
-        VehicleData.vehicle_id,
-        db.func.max(VehicleData.id).label('max_id')
-    ).group_by(VehicleData.vehicle_id).subquery()
-
-    results = db.session.query(VehicleData).join(
-        subquery, VehicleData.id == subquery.c.max_id
-    ).all()
-
-    locations = []
-    for item in results:
-        payload = item.parsed_payload
-        if 'latitude' in payload and 'longitude' in payload:
-            locations.append({
-                'vehicle_id': item.vehicle_id,
-                'payload': payload # Send the full parsed payload for map popups
-            })
-            
-    return jsonify({"locations": locations})
+    with _latest_data_cache_lock:
+        # Concurrent polls wait here and reuse the result instead of each querying the DB
+        generation = _latest_data_generation # Read before querying so a concurrent commit marks the result stale
+        cached = _latest_data_cache.get('latest')
+        if cached is not None and cached[0] > time.monotonic() and cached[1] == generation:
+            locations = cached[2]
+        else:
+            locations = query_latest_vehicle_locations()
+            _latest_data_cache['latest'] = (time.monotonic() + LATEST_DATA_CACHE_TTL, generation, locations)
+
+    return jsonify(locations)
 
 
 # --- Utility / CLI Commands (Optional) ---
@@ -253,7 +518,7 @@ def create_admin_command():
             print("Invalid role. Must be 'doctor' or 'police'.")
             return
         
-        if User.query.filter_by(username=username).first():
+        if db.session.execute(db.select(User.id).where(User.username == username)).first():
             print(f"User {username} already exists.")
             return
 
@@ -265,8 +530,6 @@ def create_admin_command():
 
 # --- Main Execution ---
 if __name__ == '__main__':
-    # Create tables if they don't exist (for development)
-    # For production, use migrations (e.g., Flask-Migrate)
-    with app.app_context():
-        db.create_all() 
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Tables are created once with `flask init-db` (use migrations, e.g. Flask-Migrate, in production)
+    # Development server only; use wsgi.py with gunicorn in production
+    app.run(debug=os.environ.get('FLASK_ENV') == 'development', host='0.0.0.0', port=5000)
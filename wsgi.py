@@ -0,0 +1,6 @@
+# WSGI entrypoint for production servers, e.g.:
+#   gunicorn -k gthread -w 4 --threads 8 -b 0.0.0.0:5000 wsgi:app
+from app import app
+
+if __name__ == '__main__':
+    app.run()